@@ -26,6 +26,18 @@ This material is based upon work supported by the National Science Foundation un
 '''
 
 from sage.all import *
+import numpy as np
+from multiprocessing import Pool
+
+try:
+    from numba import njit
+except ImportError: #The traversal below still runs as ordinary python when numba isn't installed
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        def decorator(func):
+            return func
+        return decorator
 
 #Basic driver function
 def main():
@@ -56,180 +68,315 @@ class legendrian_mosaic:
         ((0,2),(1,3),(2,0),(3,1))
     )
 
+    #Connections reindexed by (tile type, incoming face), so traversal can look up the
+    #matching connection directly instead of scanning valid_connections for it.
+    #Entries are None where a tile has no connection entering through that face.
+    connection_table = tuple(
+        tuple(next((conn for conn in conns if conn[0] == face), None) for face in range(4))
+        for conns in valid_connections
+    )
+
+    #connection_table encoded for the jitted traversal: a (10,4,2) int8 array indexed by
+    #(tile type, incoming face), with (-1,-1) marking faces that have no connection
+    connection_array = np.array(
+        [[conn if conn != None else (-1, -1) for conn in row] for row in connection_table],
+        dtype=np.int8
+    )
+
     #Dictionary of homfly polynomials for all prime knots through 8 crossings -- this is sufficient through 5x5 mosiacs
-    knot_list = {
-        Knots().one().homfly_polynomial() : '0_1',
-        Knots().from_table(3,1).homfly_polynomial() : '3_1',
-        Knots().from_table(3,1).mirror_image().homfly_polynomial(): 'm(3_1)',
-        Knots().from_table(4,1).homfly_polynomial() : '4_1',
-        Knots().from_table(5,1).homfly_polynomial() : '5_1',
-        Knots().from_table(5,1).mirror_image().homfly_polynomial(): 'm(5_1)',
-        Knots().from_table(5,2).homfly_polynomial() : '5_2',
-        Knots().from_table(5,2).mirror_image().homfly_polynomial(): 'm(5_2)',
-        Knots().from_table(6,1).homfly_polynomial(): '6_1',
-        Knots().from_table(6,1).mirror_image().homfly_polynomial(): 'm(6_1)',
-        Knots().from_table(6,2).homfly_polynomial(): '6_2',
-        Knots().from_table(6,2).mirror_image().homfly_polynomial(): 'm(6_2)',
-        Knots().from_table(6,3).homfly_polynomial(): '6_3',
-        Knots().from_table(7,1).homfly_polynomial(): '7_1',
-        Knots().from_table(7,1).mirror_image().homfly_polynomial(): 'm(7_1)',
-        Knots().from_table(7,2).homfly_polynomial(): '7_2',
-        Knots().from_table(7,2).mirror_image().homfly_polynomial(): 'm(7_2)',
-        Knots().from_table(7,3).homfly_polynomial(): '7_3',
-        Knots().from_table(7,3).mirror_image().homfly_polynomial(): 'm(7_3)',
-        Knots().from_table(7,4).homfly_polynomial(): '7_4',
-        Knots().from_table(7,4).mirror_image().homfly_polynomial(): 'm(7_4)',
-        Knots().from_table(7,5).homfly_polynomial(): '7_5',
-        Knots().from_table(7,5).mirror_image().homfly_polynomial(): 'm(7_5)',
-        Knots().from_table(7,6).homfly_polynomial(): '7_6',
-        Knots().from_table(7,6).mirror_image().homfly_polynomial(): 'm(7_6)',
-        Knots().from_table(7,7).homfly_polynomial(): '7_7',
-        Knots().from_table(7,7).mirror_image().homfly_polynomial(): 'm(7_7)',
-        Knots().from_table(8,1).homfly_polynomial(): '8_1',
-        Knots().from_table(8,1).mirror_image().homfly_polynomial(): 'm(8_1)',
-        Knots().from_table(8,2).homfly_polynomial(): '8_2',
-        Knots().from_table(8,2).mirror_image().homfly_polynomial(): 'm(8_2)',
-        Knots().from_table(8,3).homfly_polynomial(): '8_3',
-        Knots().from_table(8,4).homfly_polynomial(): '8_4',
-        Knots().from_table(8,4).mirror_image().homfly_polynomial(): 'm(8_4)',
-        Knots().from_table(8,5).homfly_polynomial(): '8_5',
-        Knots().from_table(8,5).mirror_image().homfly_polynomial(): 'm(8_5)',
-        Knots().from_table(8,6).homfly_polynomial(): '8_6',
-        Knots().from_table(8,6).mirror_image().homfly_polynomial(): 'm(8_6)',
-        Knots().from_table(8,7).homfly_polynomial(): '8_7',
-        Knots().from_table(8,7).mirror_image().homfly_polynomial(): 'm(8_7)',
-        Knots().from_table(8,8).homfly_polynomial(): '8_8',
-        Knots().from_table(8,8).mirror_image().homfly_polynomial(): 'm(8_8)',
-        Knots().from_table(8,9).homfly_polynomial(): '8_9',
-        Knots().from_table(8,10).homfly_polynomial(): '8_10',
-        Knots().from_table(8,10).mirror_image().homfly_polynomial(): 'm(8_10)',
-        Knots().from_table(8,11).homfly_polynomial(): '8_11',
-        Knots().from_table(8,11).mirror_image().homfly_polynomial(): 'm(8_11)',
-        Knots().from_table(8,12).homfly_polynomial(): '8_12',
-        Knots().from_table(8,13).homfly_polynomial(): '8_13',
-        Knots().from_table(8,13).mirror_image().homfly_polynomial(): 'm(8_13)',
-        Knots().from_table(8,14).homfly_polynomial(): '8_14',
-        Knots().from_table(8,14).mirror_image().homfly_polynomial(): 'm(8_14)',
-        Knots().from_table(8,15).homfly_polynomial(): '8_15',
-        Knots().from_table(8,15).mirror_image().homfly_polynomial(): 'm(8_15)',
-        Knots().from_table(8,16).homfly_polynomial(): '8_16',
-        Knots().from_table(8,16).mirror_image().homfly_polynomial(): 'm(8_16)',
-        Knots().from_table(8,17).homfly_polynomial(): '8_17',
-        Knots().from_table(8,17).homfly_polynomial(): 'm(8_17)',
-        Knots().from_table(8,18).homfly_polynomial(): '8_18',
-        Knots().from_table(8,19).homfly_polynomial(): '8_19',
-        Knots().from_table(8,19).mirror_image().homfly_polynomial(): 'm(8_19)',
-        Knots().from_table(8,20).homfly_polynomial(): '8_20',
-        Knots().from_table(8,20).mirror_image().homfly_polynomial(): 'm(8_20)',
-        Knots().from_table(8,21).homfly_polynomial(): '8_21',
-        Knots().from_table(8,21).mirror_image().homfly_polynomial(): 'm(8_21)',
-    }
-    
+    #Built lazily on first use, since filling it costs ~60 sage HOMFLY evaluations that
+    #shouldn't be paid just for importing the module
+    _knot_list = None
+
+    @classmethod
+    def knot_list(cls):
+        if cls._knot_list is None:
+            cls._knot_list = {
+            str(Knots().one().homfly_polynomial()): '0_1',
+            str(Knots().from_table(3,1).homfly_polynomial()): '3_1',
+            str(Knots().from_table(3,1).mirror_image().homfly_polynomial()): 'm(3_1)',
+            str(Knots().from_table(4,1).homfly_polynomial()): '4_1',
+            str(Knots().from_table(5,1).homfly_polynomial()): '5_1',
+            str(Knots().from_table(5,1).mirror_image().homfly_polynomial()): 'm(5_1)',
+            str(Knots().from_table(5,2).homfly_polynomial()): '5_2',
+            str(Knots().from_table(5,2).mirror_image().homfly_polynomial()): 'm(5_2)',
+            str(Knots().from_table(6,1).homfly_polynomial()): '6_1',
+            str(Knots().from_table(6,1).mirror_image().homfly_polynomial()): 'm(6_1)',
+            str(Knots().from_table(6,2).homfly_polynomial()): '6_2',
+            str(Knots().from_table(6,2).mirror_image().homfly_polynomial()): 'm(6_2)',
+            str(Knots().from_table(6,3).homfly_polynomial()): '6_3',
+            str(Knots().from_table(7,1).homfly_polynomial()): '7_1',
+            str(Knots().from_table(7,1).mirror_image().homfly_polynomial()): 'm(7_1)',
+            str(Knots().from_table(7,2).homfly_polynomial()): '7_2',
+            str(Knots().from_table(7,2).mirror_image().homfly_polynomial()): 'm(7_2)',
+            str(Knots().from_table(7,3).homfly_polynomial()): '7_3',
+            str(Knots().from_table(7,3).mirror_image().homfly_polynomial()): 'm(7_3)',
+            str(Knots().from_table(7,4).homfly_polynomial()): '7_4',
+            str(Knots().from_table(7,4).mirror_image().homfly_polynomial()): 'm(7_4)',
+            str(Knots().from_table(7,5).homfly_polynomial()): '7_5',
+            str(Knots().from_table(7,5).mirror_image().homfly_polynomial()): 'm(7_5)',
+            str(Knots().from_table(7,6).homfly_polynomial()): '7_6',
+            str(Knots().from_table(7,6).mirror_image().homfly_polynomial()): 'm(7_6)',
+            str(Knots().from_table(7,7).homfly_polynomial()): '7_7',
+            str(Knots().from_table(7,7).mirror_image().homfly_polynomial()): 'm(7_7)',
+            str(Knots().from_table(8,1).homfly_polynomial()): '8_1',
+            str(Knots().from_table(8,1).mirror_image().homfly_polynomial()): 'm(8_1)',
+            str(Knots().from_table(8,2).homfly_polynomial()): '8_2',
+            str(Knots().from_table(8,2).mirror_image().homfly_polynomial()): 'm(8_2)',
+            str(Knots().from_table(8,3).homfly_polynomial()): '8_3',
+            str(Knots().from_table(8,4).homfly_polynomial()): '8_4',
+            str(Knots().from_table(8,4).mirror_image().homfly_polynomial()): 'm(8_4)',
+            str(Knots().from_table(8,5).homfly_polynomial()): '8_5',
+            str(Knots().from_table(8,5).mirror_image().homfly_polynomial()): 'm(8_5)',
+            str(Knots().from_table(8,6).homfly_polynomial()): '8_6',
+            str(Knots().from_table(8,6).mirror_image().homfly_polynomial()): 'm(8_6)',
+            str(Knots().from_table(8,7).homfly_polynomial()): '8_7',
+            str(Knots().from_table(8,7).mirror_image().homfly_polynomial()): 'm(8_7)',
+            str(Knots().from_table(8,8).homfly_polynomial()): '8_8',
+            str(Knots().from_table(8,8).mirror_image().homfly_polynomial()): 'm(8_8)',
+            str(Knots().from_table(8,9).homfly_polynomial()): '8_9',
+            str(Knots().from_table(8,10).homfly_polynomial()): '8_10',
+            str(Knots().from_table(8,10).mirror_image().homfly_polynomial()): 'm(8_10)',
+            str(Knots().from_table(8,11).homfly_polynomial()): '8_11',
+            str(Knots().from_table(8,11).mirror_image().homfly_polynomial()): 'm(8_11)',
+            str(Knots().from_table(8,12).homfly_polynomial()): '8_12',
+            str(Knots().from_table(8,13).homfly_polynomial()): '8_13',
+            str(Knots().from_table(8,13).mirror_image().homfly_polynomial()): 'm(8_13)',
+            str(Knots().from_table(8,14).homfly_polynomial()): '8_14',
+            str(Knots().from_table(8,14).mirror_image().homfly_polynomial()): 'm(8_14)',
+            str(Knots().from_table(8,15).homfly_polynomial()): '8_15',
+            str(Knots().from_table(8,15).mirror_image().homfly_polynomial()): 'm(8_15)',
+            str(Knots().from_table(8,16).homfly_polynomial()): '8_16',
+            str(Knots().from_table(8,16).mirror_image().homfly_polynomial()): 'm(8_16)',
+            str(Knots().from_table(8,17).homfly_polynomial()): '8_17',
+            str(Knots().from_table(8,17).homfly_polynomial()): 'm(8_17)',
+            str(Knots().from_table(8,18).homfly_polynomial()): '8_18',
+            str(Knots().from_table(8,19).homfly_polynomial()): '8_19',
+            str(Knots().from_table(8,19).mirror_image().homfly_polynomial()): 'm(8_19)',
+            str(Knots().from_table(8,20).homfly_polynomial()): '8_20',
+            str(Knots().from_table(8,20).mirror_image().homfly_polynomial()): 'm(8_20)',
+            str(Knots().from_table(8,21).homfly_polynomial()): '8_21',
+            str(Knots().from_table(8,21).mirror_image().homfly_polynomial()): 'm(8_21)',
+            }
+        return cls._knot_list
+
+    #Computed HOMFLY polynomials keyed by (gauss code, crossing signs) -- mosaics of the same
+    #knot frequently repeat gauss codes, and the skein computation is expensive enough that
+    #recomputing them dominates cataloging time. Each Pool worker keeps its own copy.
+    _homfly_cache = {}
 
     @classmethod
     def batch_catalog(cls, in_filename, out_filename):
         knot_catalog = dict() 
         in_file = open(in_filename, 'r')
-        out_file = open(out_filename, 'w')
+        out_file = open(out_filename, 'w', buffering=1<<20)
         size = int(len(in_file.readline().strip())**(0.5)) #Determining size of mosaics in file
         knot_count = 0
 
-        mosaic = [0]*(size ** 2)
-        satisfied = [False]*(size ** 2) #Represents whether all strands in a tile have been traversed
-        crossing_number = [0]*(size ** 2) #The number assigned to a crossing in extended gauss code
-        gauss_code = []
-        crossing_signs = []
-        made_connections = [[] for _ in range(size ** 2)]
-        crossing_count = 0
-        i = 0
-        num = 0
-        writhe = 0
-        up_cusps = 0
-        down_cusps = 0
-        curr_tile = 0
-        starting_tile = None
-        face = 0
-
-        while True:    
-            mosaic_string = in_file.readline().strip()
-            if len(mosaic_string) == 0:
-                break
-            for char in mosaic_string:
-                num = int(char)
-                mosaic[i] = num
-                satisfied[i] = num == 0
-                if starting_tile == None and num != 0:
-                    starting_tile = i
-                i += 1
-            if starting_tile == None:
-                continue
-
-            curr_tile = starting_tile
-            face = cls.valid_connections[mosaic[curr_tile]][0][0] 
-            while curr_tile != starting_tile or not satisfied[curr_tile]:
-                for conn in cls.valid_connections[mosaic[curr_tile]]:
-                    if conn[0] == face:
-                        made_connections[curr_tile].append(conn)
-                        if ((len(made_connections[curr_tile]) == 1) and mosaic[curr_tile] < 7) or (len(made_connections[curr_tile]) == 2):
-                            satisfied[curr_tile] = True
-                        if conn in [(0,3),(1,2)]:
-                            down_cusps += 1
-                        if conn in [(3,0),(2,1)]:    
-                            up_cusps += 1
-
-                        #Logic for crossings
-                        if mosaic[curr_tile] == 9:
-                            if satisfied[curr_tile]:
-                                if conn[0] % 2 == 1: #Over crossing
-                                    gauss_code.append(crossing_number[curr_tile])
-                                else:
-                                    gauss_code.append(-crossing_number[curr_tile])
-                                if conn[0] + made_connections[curr_tile][0][0] == 3: #Positive crossing
-                                    writhe += 1
-                                    crossing_signs[crossing_number[curr_tile]-1] = 1
-                                else: #Negative crossing
-                                    writhe -= 1
-                                    crossing_signs[crossing_number[curr_tile]-1] = -1
-                            else:
-                                crossing_count += 1
-                                crossing_signs.append(0)
-                                if conn[0] % 2 == 1:
-                                    crossing_number[curr_tile] = crossing_count
-                                    gauss_code.append(crossing_count)
-                                else:
-                                    crossing_number[curr_tile] = crossing_count
-                                    gauss_code.append(-crossing_count)
-                        face = (conn[1] + 2) % 4 #incoming face for next tile
-                        if face == 0: #Left
-                            curr_tile -= 1 
-                        elif face == 1: #Down
-                            curr_tile += size
-                        elif face == 2: #Right
-                            curr_tile += 1
-                        elif face == 3: #Up
-                            curr_tile -= size
-                        break
-            if all(satisfied):
+        def lines():
+            for mosaic_string in in_file:
+                mosaic_string = mosaic_string.rstrip()
+                if len(mosaic_string) == 0:
+                    break
+                yield mosaic_string
+
+        #Mosaic lines are independent, so workers traverse them and compute HOMFLY polynomials
+        #in parallel; the main process only resolves knot names, deduplicates into the catalog,
+        #and writes output. imap keeps results in input order so the catalog stays deterministic.
+        with Pool(initializer=_init_worker, initargs=(size,)) as pool:
+            for result in pool.imap(_process_line, lines(), chunksize=256):
+                if result == None:
+                    continue
+                poly, tb, rotation, mosaic_string = result
                 knot_count += 1
+                if poly is None:
+                    knot_type = '0_1'
+                else:
+                    #Sage polynomial hashing is costly, so the table is keyed by str form
+                    key = str(poly)
+                    knot_type = cls.knot_list().get(key, key)
                 #First element is smooth knot type (or HOMFLY polynomial if not found), second element is Thurston-Bennquin number, third element is rotation number
-                tup = ('0_1' if len(gauss_code) < 3 else (cls.knot_list.get(Link([[gauss_code],crossing_signs]).homfly_polynomial(), Link([[gauss_code],crossing_signs]).homfly_polynomial())), writhe - (up_cusps + down_cusps) // 2, abs(up_cusps - down_cusps) // 2)
+                tup = (knot_type, tb, rotation)
                 if not tup in knot_catalog:
                     out_file.write(f"{tup[0]} | {tup[1]:>3} | {tup[2]:>3} | {mosaic_string}\n")
-                    out_file.flush()
                     knot_catalog[tup] = mosaic_string
-        
-            #Resetting variables between mosaics
-            gauss_code = []
-            crossing_signs = []
-            for list in made_connections:
-                list.clear()
-            crossing_count = 0
-            i = 0
-            num = 0
-            writhe = 0
-            up_cusps = 0
-            down_cusps = 0
-            starting_tile = None
         out_file.close()
         print(knot_count)
-main()
+
+#Lookup tables for branchless counting in the traversal loop.
+#DOWN_CUSP and UP_CUSP are indexed by (incoming face << 2) | outgoing face and mark the
+#connections that bend through a cusp; CROSS_SIGN[in, first_in] is the sign of a crossing
+#whose two passes enter through faces in and first_in (+1 when they sum to 3).
+DOWN_CUSP = np.zeros(16, dtype=np.int8)
+DOWN_CUSP[(0 << 2) | 3] = 1
+DOWN_CUSP[(1 << 2) | 2] = 1
+UP_CUSP = np.zeros(16, dtype=np.int8)
+UP_CUSP[(3 << 2) | 0] = 1
+UP_CUSP[(2 << 2) | 1] = 1
+CROSS_SIGN = np.array([[1 if in_face + first_in == 3 else -1 for first_in in range(4)] for in_face in range(4)], dtype=np.int8)
+
+#Faces used by each tile type as a 4-bit mask: bit f is set when some connection of the
+#tile enters or exits through face f
+FACE_MASK = np.zeros(10, dtype=np.int8)
+for _tile, _conns in enumerate(legendrian_mosaic.valid_connections):
+    for _conn in _conns:
+        FACE_MASK[_tile] |= (1 << _conn[0]) | (1 << _conn[1])
+
+@njit(cache=True)
+def _find(parent, t):
+    while parent[t] != t:
+        parent[t] = parent[parent[t]]
+        t = parent[t]
+    return t
+
+#Union-find over the 4-neighbor adjacencies implied by each tile's faces. A knot's strand
+#visits every nonzero tile, so a mosaic whose nonzero tiles split into more than one
+#component can be rejected without traversing it or touching sage.
+@njit(cache=True)
+def _connected(mosaic, size, face_mask, parent):
+    n = size * size
+    for t in range(n):
+        parent[t] = t
+    for t in range(n):
+        if mosaic[t] == 0:
+            continue
+        mask = face_mask[mosaic[t]]
+        if (mask & 1) and t % size != size - 1 and mosaic[t+1] != 0 and (face_mask[mosaic[t+1]] & 4): #Right neighbor's left face
+            root_a = _find(parent, t)
+            root_b = _find(parent, t+1)
+            if root_a != root_b:
+                parent[root_a] = root_b
+        if (mask & 8) and t + size < n and mosaic[t+size] != 0 and (face_mask[mosaic[t+size]] & 2): #Lower neighbor's top face
+            root_a = _find(parent, t)
+            root_b = _find(parent, t+size)
+            if root_a != root_b:
+                parent[root_a] = root_b
+    roots = 0
+    for t in range(n):
+        if mosaic[t] != 0 and _find(parent, t) == t:
+            roots += 1
+    return roots == 1
+
+#Hot traversal loop, jit-compiled by numba when it's available.
+#Walks the knot from starting_tile, building the extended gauss code and counting
+#writhe and cusps along the way; the sage HOMFLY computation stays outside the jit region.
+@njit(cache=True)
+def _traverse(mosaic, size, starting_tile, face, conn_table,
+              satisfied, crossing_number, first_in, conn_count, gauss_code, crossing_signs, step):
+    #satisfied tracks whether all strands in a tile have been traversed; crossing_number holds
+    #the number assigned to each crossing in the extended gauss code; first_in records the
+    #incoming face of the first connection made through a tile, which is all the crossing sign
+    #logic ever looks at. All workspaces are caller-owned and reset in place here, so a batch
+    #run never reallocates them.
+    satisfied[:] = mosaic == 0
+    conn_count.fill(0)
+    gc_len = 0
+    crossing_count = 0
+    writhe = 0
+    up_cusps = 0
+    down_cusps = 0
+    unsatisfied = np.count_nonzero(mosaic) #Tiles not yet fully traversed; the mosaic is a knot when this hits zero
+
+    curr_tile = starting_tile
+    while curr_tile != starting_tile or not satisfied[curr_tile]:
+        tile = mosaic[curr_tile]
+        in_face = conn_table[tile, face, 0]
+        out_face = conn_table[tile, face, 1]
+        slot = conn_count[curr_tile]
+        if slot == 0:
+            first_in[curr_tile] = in_face
+        conn_count[curr_tile] = slot + 1
+        if not satisfied[curr_tile] and ((slot == 0 and tile < 7) or slot == 1):
+            satisfied[curr_tile] = True
+            unsatisfied -= 1
+        code = (in_face << 2) | out_face
+        down_cusps += DOWN_CUSP[code]
+        up_cusps += UP_CUSP[code]
+
+        #Logic for crossings
+        if tile == 9:
+            if satisfied[curr_tile]:
+                if in_face % 2 == 1: #Over crossing
+                    gauss_code[gc_len] = crossing_number[curr_tile]
+                else:
+                    gauss_code[gc_len] = -crossing_number[curr_tile]
+                gc_len += 1
+                sign = CROSS_SIGN[in_face, first_in[curr_tile]] #+1 for a positive crossing, -1 for a negative one
+                writhe += sign
+                crossing_signs[crossing_number[curr_tile]-1] = sign
+            else:
+                crossing_count += 1
+                crossing_signs[crossing_count-1] = 0
+                crossing_number[curr_tile] = crossing_count
+                if in_face % 2 == 1:
+                    gauss_code[gc_len] = crossing_count
+                else:
+                    gauss_code[gc_len] = -crossing_count
+                gc_len += 1
+        face = (out_face + 2) & 3 #incoming face for next tile
+        curr_tile += step[face]
+    return gauss_code[:gc_len], crossing_signs[:crossing_count], writhe, up_cusps, down_cusps, unsatisfied == 0
+
+#Per-process traversal workspaces, created once in each Pool worker by _init_worker
+_workspace = None
+
+def _init_worker(size):
+    global _workspace
+    n = size ** 2
+    _workspace = {
+        'size': size,
+        'mosaic': np.zeros(n, dtype=np.int8),
+        'satisfied': np.zeros(n, dtype=np.bool_),
+        'crossing_number': np.zeros(n, dtype=np.int32),
+        'first_in': np.full(n, -1, dtype=np.int8),
+        'conn_count': np.zeros(n, dtype=np.int8),
+        'gauss_code': np.empty(4 * n, dtype=np.int32),
+        'crossing_signs': np.empty(n, dtype=np.int8),
+        'step': np.array((-1, size, 1, -size), dtype=np.int32), #Tile offset for each incoming face: left, down, right, up
+        'parent': np.empty(n, dtype=np.int32), #Union-find scratch for the connectivity pre-pass
+    }
+    #All workspaces keep the row-major layout of the input lines: even a 10x10 mosaic's byte
+    #arrays span only a couple of cache lines, so fancier layouts (e.g. z-order) would cost
+    #an extra indirection per step without improving locality.
+
+def _process_line(mosaic_string):
+    '''Traverse one mosaic line and compute its HOMFLY polynomial.
+
+    Returns (poly, tb, rotation, mosaic_string) for knots, with poly None for gauss codes
+    too short to be anything but the unknot, or None when the line is not a knot.
+    '''
+    ws = _workspace
+    size = ws['size']
+    #One vectorized pass over the line: subtracting ord('0') turns the ascii digits into tile
+    #types, written into the preallocated per-worker buffer
+    mosaic = ws['mosaic']
+    np.subtract(np.frombuffer(mosaic_string.encode('ascii'), dtype=np.int8), 48, out=mosaic)
+    if not mosaic.any():
+        return None
+    starting_tile = int((mosaic != 0).argmax()) #Index of the first nonzero tile
+
+    #Mosaics whose nonzero tiles form more than one component can't be knots, so the
+    #cheap union-find pass skips the traversal for them
+    if not _connected(mosaic, size, FACE_MASK, ws['parent']):
+        return None
+
+    face = legendrian_mosaic.valid_connections[int(mosaic[starting_tile])][0][0]
+    gauss_code, crossing_signs, writhe, up_cusps, down_cusps, is_knot = _traverse(mosaic, size, starting_tile, face,
+        legendrian_mosaic.connection_array, ws['satisfied'], ws['crossing_number'], ws['first_in'], ws['conn_count'],
+        ws['gauss_code'], ws['crossing_signs'], ws['step'])
+    if not is_knot:
+        return None
+    gauss_code = [int(num) for num in gauss_code]
+    crossing_signs = [int(num) for num in crossing_signs]
+    if len(gauss_code) < 3:
+        poly = None
+    else:
+        key = (tuple(gauss_code), tuple(crossing_signs))
+        poly = legendrian_mosaic._homfly_cache.get(key)
+        if poly is None:
+            poly = Link([[gauss_code],crossing_signs]).homfly_polynomial()
+            legendrian_mosaic._homfly_cache[key] = poly
+    return (poly, int(writhe - (up_cusps + down_cusps) // 2), int(abs(up_cusps - down_cusps) // 2), mosaic_string)
+
+if __name__ == '__main__':
+    main()
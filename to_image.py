@@ -7,7 +7,8 @@ python to_image <mosaic code>
 This material is based upon work supported by the National Science Foundation under Grant No. MPS-2150299
 '''
 import sys,os
-from PIL import Image, ImageDraw
+import functools
+from PIL import Image
 
 def main():
     if len(sys.argv) != 2:
@@ -17,35 +18,58 @@ def main():
         mosaic = [int(digit) for digit in mosaic_string]
         to_png(mosaic,mosaic_string + ".png") 
 
+#Tiles are cached after their first load, so batches of mosaics only pay the decode cost once
+@functools.lru_cache(maxsize=None)
+def load_tile(num):
+    file_name = f"tiles/{num}.png"
+    try:
+        return Image.open(file_name).convert("RGBA")
+    except FileNotFoundError:
+        print(f"Failed to load image {file_name}")
+        return None
+
+#The mosaic is always rotated by exactly 45 degrees, so each tile only needs to be resampled
+#once; the cached rotated tiles are then pasted straight onto the diamond grid
+@functools.lru_cache(maxsize=None)
+def load_rotated_tile(num):
+    tile_image = load_tile(num)
+    if tile_image is None:
+        return None
+    return tile_image.rotate(45, expand=True, resample=Image.BICUBIC, fillcolor=(0, 0, 0, 0))
+
+#Rotated border-color backdrop shared by every mosaic of the same width
+@functools.lru_cache(maxsize=None)
+def rotated_background(mosaic_width, border_color):
+    backdrop = Image.new("RGBA", (mosaic_width, mosaic_width), border_color)
+    return backdrop.rotate(45, expand=True, resample=Image.BICUBIC, fillcolor=(0, 0, 0, 0))
+
 def to_png(matrix,output_filename):
     tile_size = 128
     border_size = 4
     border_color = (196, 196, 196, 255)
     size = int(len(matrix)**0.5)
 
-    tile_images = {}
-    for num in range(10):
-        file_name = f"tiles/{num}.png"
-        try:
-            tile_images[num] = Image.open(file_name).convert("RGBA")
-        except FileNotFoundError:
-            print(f"Failed to load image {file_name}")
-
     mosaic_width = size * tile_size + 2 * border_size
-    mosaic = Image.new("RGBA", (mosaic_width, mosaic_width), border_color)
-    draw = ImageDraw.Draw(mosaic)
+    mosaic = rotated_background(mosaic_width, border_color).copy()
 
+    #Paste each pre-rotated tile where the full-image rotation would have put it: a source
+    #point (sx, sy) relative to the mosaic's center lands at (s*(sx + sy), s*(-sx + sy))
+    #relative to the rotated image's center
+    s = 0.5 ** 0.5
+    center_x = mosaic.width / 2
+    center_y = mosaic.height / 2
     for i, tile in enumerate(matrix):
-            if tile in tile_images:
-                img_tile = tile_images[tile]
-                for y in range(tile_size):
-                    for x in range(tile_size):
-                        pixel = img_tile.getpixel((x, y))
-                        mosaic.putpixel(( (i % size) * tile_size + x + border_size, (i // size) * tile_size + y + border_size), pixel)
+        img_tile = load_rotated_tile(tile)
+        if img_tile is not None:
+            row, col = divmod(i, size)
+            sx = border_size + (col + 0.5) * tile_size - mosaic_width / 2
+            sy = border_size + (row + 0.5) * tile_size - mosaic_width / 2
+            x = round(center_x + s * (sx + sy) - img_tile.width / 2)
+            y = round(center_y + s * (-sx + sy) - img_tile.height / 2)
+            mosaic.paste(img_tile, (x, y), img_tile)
 
     os.makedirs("images", exist_ok=True)
-    rotated_mosaic = mosaic.rotate(45, expand=True, resample=Image.BICUBIC, fillcolor=(0, 0, 0, 0))
-    rotated_mosaic.save(f"images/{output_filename}")
+    mosaic.save(f"images/{output_filename}")
     print(f"Mosaic saved at images/{output_filename}")
 
 